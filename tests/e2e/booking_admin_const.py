@@ -1,8 +1,18 @@
 from common_const import get_var_from_env
 url_admin_booking = get_var_from_env("url_admin_booking", "/admin/buchungen.html")
-url_admin_booking_api = get_var_from_env("url_admin_booking", "/api/admin/bookings")
+url_admin_booking_api = get_var_from_env("url_admin_booking_api", "/api/admin/bookings")
+url_admin_api = get_var_from_env("url_admin_api", "/api/admin/")
+url_admin_delete_api = get_var_from_env("url_admin_delete_api", "/api/admin/delete")
+admin_booking_range_days = int(get_var_from_env("admin_booking_range_days", 365))
+# How long a booking flow waits for its booking to show up before deleting it, in milliseconds
+booking_cleanup_timeout = int(get_var_from_env("booking_cleanup_timeout", 10000))
+url_available_slots_api = get_var_from_env("url_available_slots_api", "/api/gcal/available-slots")
+url_book_api = get_var_from_env("url_book_api", "/api/gcal/book")
+seed_booking_duration = int(get_var_from_env("seed_booking_duration", 60))
+seed_booking_range_days = int(get_var_from_env("seed_booking_range_days", 14))
 h1_booking_admin = get_var_from_env("h1_success", "Buchungen verwalten")
 load_bookings_id = get_var_from_env("load_bookings_id", "load-bookings")
 admin_booking_list_id = get_var_from_env("admin_booking_list_id", "booking-list")
 button_confirm_delete_id = get_var_from_env("button_confirm_delete_id", "confirm-delete")
-button_delete_text = get_var_from_env("button_delete_text", "Löschen")
\ No newline at end of file
+button_delete_text = get_var_from_env("button_delete_text", "Löschen")
+no_bookings_text = get_var_from_env("no_bookings_text", "Keine Buchungen im Zeitraum.")
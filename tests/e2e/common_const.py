@@ -1,13 +1,25 @@
+import functools
 import os
-import dotenv
 from dotenv import load_dotenv
-load_dotenv()
 
+@functools.lru_cache(maxsize=None)
+def _ensure_env():
+    """
+    Load .env once and return a snapshot of the environment.
+    Child processes (e.g. xdist workers) inherit the loaded variables and skip the .env lookup.
+    """
+    if not os.environ.get("CONNECTIFY_DOTENV_LOADED"):
+        load_dotenv()
+        os.environ["CONNECTIFY_DOTENV_LOADED"] = "1"
+    return dict(os.environ)
+
+@functools.lru_cache(maxsize=None)
 def get_var_from_env(var_name, override=None):
     """
     Get environment variable value.
+    Results are cached per (var_name, override).
     """
-    result = os.getenv(var_name.upper())
+    result = _ensure_env().get(var_name.upper())
     if not result:
         result = globals().get(var_name)
         if override and not result:
@@ -0,0 +1,201 @@
+"""
+Shared pytest configuration for the E2E booking tests.
+"""
+
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+import pytest
+from playwright.sync_api import BrowserContext, sync_playwright
+
+from playwright_const import browser_args
+from test_admin_delete_bookings import seed_booking
+from test_session_id import new_context, save_failure_screenshots, wait_for_video_conversions
+
+# (process, user_data_dir, ws_endpoint) of the browser shared by the xdist workers
+cdp_browser_key = pytest.StashKey[tuple]()
+
+
+def pytest_addoption(parser):
+    parser.addoption("--headless", action="store_true", help="Run tests in headless mode")
+    parser.addoption("--record", action="store_true", help="Record a video of each test")
+
+
+def is_headless(config):
+    """
+    Whether the browser runs without UI, selected by --headless or E2E_HEADLESS=1 (e.g. in CI).
+    """
+    return config.getoption("--headless") or os.getenv("E2E_HEADLESS") == "1"
+
+
+def launch_cdp_browser(headless=False, timeout=30):
+    """
+    Start a Chromium process that other processes can connect to over CDP.
+
+    Args:
+        headless: Whether to run in headless mode
+        timeout: Timeout in seconds for the DevTools endpoint to become available
+
+    Returns:
+        Tuple of (process, user_data_dir, ws_endpoint)
+    """
+    with sync_playwright() as playwright:
+        executable = playwright.chromium.executable_path
+
+    user_data_dir = tempfile.mkdtemp(prefix="connectify_e2e_")
+    args = [
+        executable,
+        "--remote-debugging-port=0",
+        f"--user-data-dir={user_data_dir}",
+        "--no-first-run",
+        "--no-default-browser-check",
+        # Background services Playwright also disables in the browsers it launches itself
+        "--disable-background-networking",
+        "--disable-dev-shm-usage",
+        "--disable-back-forward-cache",
+        "--disable-features=Translate,MediaRouter",
+        *browser_args,
+    ]
+    if headless:
+        args.append("--headless=new")
+    process = subprocess.Popen(args + ["about:blank"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    # Chromium writes the port it picked and the browser target path once DevTools is listening
+    port_file = Path(user_data_dir) / "DevToolsActivePort"
+    deadline_ns = time.monotonic_ns() + timeout * 1_000_000_000
+    while time.monotonic_ns() < deadline_ns and process.poll() is None:
+        if port_file.exists():
+            lines = port_file.read_text().splitlines()
+            if len(lines) >= 2:
+                port, path = lines[:2]
+                return process, user_data_dir, f"ws://127.0.0.1:{port}{path}"
+        time.sleep(0.02)
+
+    process.kill()
+    shutil.rmtree(user_data_dir, ignore_errors=True)
+    raise RuntimeError("Chromium did not expose a DevTools endpoint")
+
+
+def pytest_configure(config):
+    # setup_browser reads the env var, xdist workers inherit it
+    if config.getoption("--record"):
+        os.environ["E2E_RECORD_VIDEO"] = "1"
+
+    # Only the xdist controller launches the shared browser and only for more than one worker,
+    # the workers connect to it; a single worker launches its own browser
+    distributed = config.getoption("dist", "no") != "no" and len(config.getoption("tx", None) or []) > 1
+    if hasattr(config, "workerinput") or not distributed or config.getoption("collectonly"):
+        return
+    config.stash[cdp_browser_key] = launch_cdp_browser(headless=is_headless(config))
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_configure_node(node):
+    cdp_browser = node.config.stash.get(cdp_browser_key, None)
+    if cdp_browser:
+        node.workerinput["cdp_endpoint"] = cdp_browser[2]
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    """
+    Save a screenshot of every page still open in the test's browser context when the test fails.
+    Runs before fixture teardown, so the pages of the context fixtures are still open.
+    A context the test created itself, e.g. to record a video, is handled by cleanup_browser.
+    """
+    outcome = yield
+    report = outcome.get_result()
+    if report.when != "call" or not report.failed:
+        return
+
+    # funcargs holds the fixtures the requested ones depend on too, e.g. context and shared_context
+    contexts = {id(value): value for value in item.funcargs.values() if isinstance(value, BrowserContext)}
+    for context in contexts.values():
+        save_failure_screenshots(context, item.name)
+
+
+def pytest_sessionfinish(session):
+    # Recorded videos are converted in the background, finish them before the session ends
+    wait_for_video_conversions()
+
+
+def pytest_unconfigure(config):
+    cdp_browser = config.stash.get(cdp_browser_key, None)
+    if cdp_browser:
+        process, user_data_dir, _ = cdp_browser
+        process.terminate()
+        process.wait()
+        shutil.rmtree(user_data_dir, ignore_errors=True)
+
+
+@pytest.fixture(scope="session")
+def headless(request):
+    """
+    Whether the browser runs without UI, see is_headless.
+    """
+    return is_headless(request.config)
+
+
+@pytest.fixture(scope="session")
+def shared_browser(request, headless):
+    """
+    One browser for the whole session; each test opens its own context in it.
+    Under xdist the workers connect to the browser launched by the controller.
+    """
+    cdp_endpoint = getattr(request.config, "workerinput", {}).get("cdp_endpoint")
+    with sync_playwright() as playwright:
+        if cdp_endpoint:
+            browser = playwright.chromium.connect_over_cdp(cdp_endpoint)
+        else:
+            browser = playwright.chromium.launch(headless=headless, args=browser_args)
+        yield browser
+        browser.close()
+
+
+@pytest.fixture(scope="session")
+def shared_context(shared_browser):
+    """
+    One browser context per xdist worker (each worker runs its own session),
+    created on first use and reused by the worker's tests.
+    """
+    context = new_context(shared_browser)
+    yield context
+    context.close()
+
+
+@pytest.fixture
+def context(shared_context):
+    """
+    The worker's shared context; pages the test opened in it and its cookies are cleared afterwards.
+    """
+    yield shared_context
+    for page in shared_context.pages:
+        page.close()
+    shared_context.clear_cookies()
+
+
+@pytest.fixture
+def admin_context(shared_browser):
+    """
+    A fresh context for the admin pages, closed after the test.
+    """
+    context = new_context(shared_browser)
+    yield context
+    context.close()
+
+
+@pytest.fixture
+def seeded_booking(shared_browser):
+    """
+    Event ID of a booking created through the booking API, so admin tests have
+    a booking to delete without paying through the Stripe checkout first.
+    """
+    context = new_context(shared_browser)
+    try:
+        return seed_booking(context.new_page())
+    finally:
+        context.close()
@@ -1,17 +1,42 @@
+from urllib.parse import urlsplit
+
 from common_const import get_var_from_env
+from stripe_test_const import stripe_success_url
+
+
+def url_origin(url):
+    """
+    Origin of a URL as the browser's URL.origin has it: lower-case scheme and host,
+    without userinfo and without the scheme's default port.
+    """
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    host = parts.hostname or ""
+    if ":" in host:
+        host = f"[{host}]"
+    if parts.port is None or parts.port == {"http": 80, "https": 443}.get(scheme):
+        return f"{scheme}://{host}"
+    return f"{scheme}://{host}:{parts.port}"
+
+
 viewport_size = {"width":1920, "height":1080}
 BASE_URL = get_var_from_env("TEST_BASE_URL", "http://localhost:3000")
 HTTP_AUTH_USERNAME = get_var_from_env("HTTP_AUTH_USERNAME", "admin")
 HTTP_AUTH_PASSWORD = get_var_from_env("HTTP_AUTH_PASSWORD", "admin123")
-if HTTP_AUTH_USERNAME and HTTP_AUTH_PASSWORD:
-    http_credentials = {
-        'username': HTTP_AUTH_USERNAME,
-        'password': HTTP_AUTH_PASSWORD
-    }
-    print("HTTP Basic Auth credentials will be used.")
+http_credentials = {
+    'username': HTTP_AUTH_USERNAME,
+    'password': HTTP_AUTH_PASSWORD,
+} if HTTP_AUTH_USERNAME and HTTP_AUTH_PASSWORD else None
+# When the success page is served by the app as well, send the credentials with the first request
+# instead of waiting for a 401 challenge, scoped to the app's origin so they never reach third parties
+# like Stripe; otherwise they answer challenges from any origin
+if http_credentials and url_origin(stripe_success_url) == url_origin(BASE_URL):
+    http_credentials.update({'origin': url_origin(BASE_URL), 'send': "always"})
 
-    # Create context, passing http_credentials if they exist
-context_options = {}
-playwright_default_time_out = 15000
+# Create context, passing http_credentials if they exist
+context_options = {'viewport': viewport_size}
 if http_credentials:
     context_options['http_credentials'] = http_credentials
+playwright_default_time_out = 15000
+# Give the webcam test a fake camera and microphone, so its video plays without real devices
+browser_args = ['--use-fake-device-for-media-stream']
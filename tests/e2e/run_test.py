@@ -1,145 +1,65 @@
 #!/usr/bin/env python3
 """
-Test runner script for E2E booking tests.
+Pytest entry point for E2E booking tests.
 
-This script provides a command-line interface to run the E2E tests for adhoc and gcal booking flows.
-It offers options to run specific tests and handles errors gracefully.
+The booking flows are independent Playwright sessions that spend most of their time waiting
+on the network, so pytest-xdist runs the xdist groups on separate worker processes (see pytest.ini).
+The gcal test runs in parallel to the others and deletes its own booking again. The admin tests
+delete the bookings created by the adhoc flow, so they share an xdist group with the adhoc test
+and run on the same worker, after it.
+All tests run in one shared browser; the booking tests reuse their worker's context and the
+admin tests open a fresh context each, see conftest.py.
+Failing tests leave a screenshot of their open pages in the working directory.
 
 Usage:
-    python run_test.py [--adhoc] [--gcal] [--admin] [--headless]
+    pytest [-k adhoc|gcal|admin] [--headless] [--record]
+    python run_test.py [-k adhoc|gcal|admin] [--headless] [--record]
 
 Options:
-    --adhoc     Run only the adhoc booking test
-    --gcal      Run only the gcal booking test
-    --admin     Run only the admin bookings test
-    --headless  Run tests in headless mode (no browser UI)
+    -k adhoc    Run only the adhoc booking test
+    -k gcal     Run only the gcal booking test
+    -k admin    Run only the admin bookings tests
+    --headless  Run tests in headless mode (no browser UI, same as setting E2E_HEADLESS=1)
+    --record    Record a video of each test (same as setting E2E_RECORD_VIDEO=1)
 
-If no test options are specified, all tests will be run.
+If no test is selected with -k, all tests will be run.
 """
 
-import argparse
 import sys
-import traceback
-from datetime import datetime
-
-from test_gcal_booking import test_gcal_booking_flow
-from test_adhoc_booking import test_adhoc_booking_flow
-from test_admin_delete_bookings import test_delete_bookings_flow
-
-def run_test(test_func, headless=False):
-    """
-    Run a test function with proper error handling and timing.
-    
-    Args:
-        test_func: Function to run the test
-        headless: Whether to run in headless mode
-        
-    Returns:
-        True if test passed, False if it failed
-    """
-    test_name = test_func.__name__
-    print(f"\n{'=' * 60}")
-    print(f"RUNNING TEST: {test_name}")
-    print(f"Start time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    print(f"{'=' * 60}")
-    
-    start_time = datetime.now()
-    try:
-        # Pass headless parameter if the test function accepts it
-        test_func(headless=headless)
-        end_time = datetime.now()
-        duration = (end_time - start_time).total_seconds()
-        print(f"\n{'=' * 60}")
-        print(f"TEST PASSED: {test_name}")
-        print(f"Duration: {duration:.2f} seconds")
-        print(f"{'=' * 60}")
-        return True
-    except Exception as e:
-        end_time = datetime.now()
-        duration = (end_time - start_time).total_seconds()
-        print(f"\n{'=' * 60}")
-        print(f"TEST FAILED: {test_name}")
-        print(f"Duration: {duration:.2f} seconds")
-        print(f"Error: {e}")
-        print("\nTraceback:")
-        traceback.print_exc()
-        print(f"{'=' * 60}")
-        return False
-
-def main():
-    """
-    Main function to parse arguments and run tests.
-    """
-    parser = argparse.ArgumentParser(description="Run E2E booking tests")
-    parser.add_argument("--adhoc", action="store_true", help="Run adhoc booking test")
-    parser.add_argument("--gcal", action="store_true", help="Run gcal booking test")
-    parser.add_argument("--admin", action="store_true", help="Run admin bookings test")
-    parser.add_argument("--headless", action="store_true", help="Run tests in headless mode")
-    
-    args = parser.parse_args()
-    
-    # If no test is specified, run all tests
-    run_all = not (args.adhoc or args.gcal or args.admin)
-    
-    print(f"Test Runner - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    print(f"Running in {'headless' if args.headless else 'GUI'} mode")
-    
-    failed_tests = []
-    passed_tests = []
-    
-    # Run GCal booking test if specified or if running all tests
-    if args.gcal or run_all:
-        # Modify the test function to accept a headless parameter
-        def run_gcal_test(headless=False):
-            # Call the original function with the headless parameter
-            test_gcal_booking_flow(headless=headless)
-        
-        if run_test(run_gcal_test, headless=args.headless):
-            passed_tests.append("gcal_booking")
-        else:
-            failed_tests.append("gcal_booking")
-    
-    # Run Adhoc booking test if specified or if running all tests
-    if args.adhoc or run_all:
-        # Modify the test function to accept a headless parameter
-        def run_adhoc_test(headless=False):
-            # Call the original function with the headless parameter
-            test_adhoc_booking_flow(headless=headless)
-        
-        if run_test(run_adhoc_test, headless=args.headless):
-            passed_tests.append("adhoc_booking")
-        else:
-            failed_tests.append("adhoc_booking")
-    
-    # Run Admin bookings test if specified or if running all tests
-    # Run this AFTER the booking tests to have bookings to delete
-    if args.admin or run_all:
-        # Modify the test function to accept a headless parameter
-        def run_admin_test(headless=False):
-            # Call the original function with the headless parameter
-            test_delete_bookings_flow(headless=headless)
-        
-        if run_test(run_admin_test, headless=args.headless):
-            passed_tests.append("admin_bookings")
-        else:
-            failed_tests.append("admin_bookings")
-    
-    # Print summary
-    print("\n\n" + "=" * 60)
-    print("TEST SUMMARY")
-    print("=" * 60)
-    print(f"Passed: {len(passed_tests)} tests")
-    for test in passed_tests:
-        print(f"  ✅ {test}")
-    
-    print(f"\nFailed: {len(failed_tests)} tests")
-    for test in failed_tests:
-        print(f"  ❌ {test}")
-    
-    print("=" * 60)
-    
-    # Return exit code based on test results
-    return 1 if failed_tests else 0
+
+import pytest
+
+import test_gcal_booking
+import test_adhoc_booking
+import test_admin_delete_bookings
+
+
+@pytest.mark.xdist_group("gcal")
+def test_gcal(shared_browser, context):
+    test_gcal_booking.test_gcal_booking_flow(browser=shared_browser, context=context)
+
+
+@pytest.mark.xdist_group("bookings")
+def test_adhoc(shared_browser, context):
+    test_adhoc_booking.test_adhoc_booking_flow(browser=shared_browser, context=context)
+
+
+# Run these AFTER the adhoc test to delete the bookings it created,
+# the UI test seeds its own booking so it never depends on the Stripe flows
+@pytest.mark.xdist_group("bookings")
+def test_admin_ui(shared_browser, admin_context, seeded_booking):
+    # Smoke test of the delete dialog on the seeded booking, the remaining bookings are deleted via the API
+    test_admin_delete_bookings.test_delete_bookings_ui_flow(
+        browser=shared_browser, context=admin_context, booking_id=seeded_booking
+    )
+
+
+@pytest.mark.xdist_group("bookings")
+def test_admin(shared_browser, admin_context):
+    test_admin_delete_bookings.test_delete_bookings_flow(
+        browser=shared_browser, context=admin_context
+    )
+
 
 if __name__ == "__main__":
-    sys.exit(main())
\ No newline at end of file
+    sys.exit(pytest.main([__file__, *sys.argv[1:]]))
@@ -23,3 +23,11 @@ stripe_card_test_cvc = get_var_from_env("stripe_card_test_cvc", "123")
 stripe_card_test_billing = get_var_from_env("stripe_card_test_billing", "Test Tester")
 stripe_card_test_email = get_var_from_env("stripe_card_test_email", "test@example.com")
 stripe_success_url = get_var_from_env("stripe_success_url", "https://example.com/success")
+stripe_success_url_pattern = re.compile(rf"{re.escape(stripe_success_url)}\?session_id=([^&]*)")
+stripe_card_test_fields = {
+    stripe_card_email_id: stripe_card_test_email,
+    stripe_card_number_id: stripe_card_test_number,
+    stripe_card_expiry_id: stripe_card_test_expiry,
+    stripe_card_cvc_id: stripe_card_test_cvc,
+    stripe_card_billing_id: stripe_card_test_billing,
+}
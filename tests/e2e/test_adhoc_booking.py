@@ -1,16 +1,20 @@
-import re
-from time import sleep
+import logging
 
 from test_session_id import (
-    setup_browser, cleanup_browser, test_session_id
+    setup_browser, cleanup_browser, fill_stripe_payment_form, test_session_id
 )
 from stripe_test_const import *
 from playwright_const import *
 from success_const import *
 from webcam_const import *
 
+log = logging.getLogger(__name__)
 
-def test_adhoc_booking_flow(headless=False):
+adhoc_button = {"role": "button", "name": stripe_adhoc_text}
+adhoc_pay_button = {"role": "button", "name": stripe_adhoc_pay_button}
+
+
+def test_adhoc_booking_flow(headless=False, browser=None, context=None):
     """
     End-to-end test for the adhoc booking flow:
     1. Navigate to the adhoc booking page
@@ -19,53 +23,30 @@ def test_adhoc_booking_flow(headless=False):
     4. Verify redirection to webcam page
     """
     # Setup browser with shared function
-    playwright, page, context, browser, recording_info = setup_browser(headless=headless, test_name="adhoc_booking_flow")
+    playwright, page, context, browser, recording_info = setup_browser(headless=headless, test_name="adhoc_booking_flow", browser=browser, context=context)
 
     try:
         # Step 1: Navigate to the adhoc booking page
         page.goto(f"{BASE_URL}/")
 
-        # Wait for the page to load
-        page.wait_for_selector(f"Button:has-text('{stripe_adhoc_text}')")
-
         # Step 2: Select a duration and submit the form
-        # Find the duration dropdown or radio buttons and select a duration
-        page.click(f"button:has-text('{stripe_adhoc_text}')")  # Adjust selector based on actual UI
+        # Clicking waits for the page to render the button
+        page.get_by_role(**adhoc_button).click()
 
         # Click the book now button
-        page.click(f"button:has-text('{stripe_adhoc_pay_button}')")
+        page.get_by_role(**adhoc_pay_button).click()
 
         # Wait for the API call to complete and redirect to Stripe
         page.wait_for_url(stripe_url)
 
-        # Step 3: Fill out the Stripe payment form with test credit card
-        # Wait for Stripe iframe to load
-        page.wait_for_selector(f".{stripe_form_name}")
-
-        # Get the card iframe
-        card_form = page.locator(f".{stripe_form_name}").first
-
-        # Fill out card details
-        # email
-        card_form.locator(f"#{stripe_card_email_id}").fill(stripe_card_test_email)
-        # card number
-        card_form.locator(f"#{stripe_card_number_id}").fill(stripe_card_test_number)
-        # card expiry date
-        card_form.locator(f"#{stripe_card_expiry_id}").fill(stripe_card_test_expiry)
-        # card cvc
-        card_form.locator(f"#{stripe_card_cvc_id}").fill(stripe_card_test_cvc)
-        # card billing Name
-        card_form.locator(f"#{stripe_card_billing_id}").fill(stripe_card_test_billing)
-
-        # Submit payment
-        page.click("button:has-text('Pay')")
+        # Step 3: Fill out the Stripe payment form with test credit card and pay
+        fill_stripe_payment_form(page)
 
         # Step 4: Wait for redirect to success page
-        url_pattern = re.compile(rf"{stripe_success_url}\?session_id=([^&]*)")
-        page.wait_for_url(url_pattern)
+        page.wait_for_url(stripe_success_url_pattern)
         current_url = page.url
-        session_id = re.search(url_pattern, current_url).group(1)
-        print(f"Session ID: {session_id}")
+        session_id = stripe_success_url_pattern.search(current_url).group(1)
+        log.debug("Session ID: %s", session_id)
 
         # Use the shared test_session_id function to continue with webcam testing
         test_session_id(page, session_id)
@@ -1,131 +1,343 @@
+import datetime
+import logging
 import re
-from time import sleep
+import time
+import uuid
+
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
 
 from test_session_id import (
-    setup_browser, cleanup_browser, test_session_id, wait_for_api_request
+    setup_browser, cleanup_browser
 )
 from stripe_test_const import *
 from playwright_const import *
 from booking_admin_const import *
 
+log = logging.getLogger(__name__)
+
+prompt_delete_pattern = re.compile(r"promptDelete\('([^']+)'")
+
+
+def seed_booking(page):
+    """
+    Create a booking directly through the booking API in the first free slot,
+    without going through the Stripe checkout.
+    
+    Args:
+        page: Playwright page object
+        
+    Returns:
+        Event ID of the created booking
+    """
+    today = datetime.date.today()
+    response = page.request.get(f"{BASE_URL}{url_available_slots_api}", params={
+        "start_date": today.isoformat(),
+        "end_date": (today + datetime.timedelta(days=seed_booking_range_days)).isoformat(),
+        "duration_minutes": seed_booking_duration,
+    })
+    assert response.ok, f"Expected available slots, got status {response.status}"
+    slots = response.json()["slots"]
+    assert slots, "Expected a free slot to seed a booking"
+    
+    response = page.request.post(f"{BASE_URL}{url_book_api}", data={
+        "start_time": slots[0]["start_time"],
+        "end_time": slots[0]["end_time"],
+        "summary": "E2E admin test booking",
+        "payment_method": "test",
+        "payment_id": f"test_{uuid.uuid4()}",
+    })
+    assert response.ok, f"Expected booking to be created, got status {response.status}"
+    event_id = response.json()["event_id"]
+    log.debug("Seeded booking with ID: %s", event_id)
+    return event_id
+
+
+def list_bookings(page):
+    """
+    Bookings the admin API lists, cancelled ones included.
+    
+    Args:
+        page: Playwright page object
+        
+    Returns:
+        List of booked events as returned by the API
+    """
+    today = datetime.date.today()
+    response = page.request.get(f"{BASE_URL}{url_admin_booking_api}", params={
+        "start_date": today.isoformat(),
+        "end_date": (today + datetime.timedelta(days=admin_booking_range_days)).isoformat(),
+        "include_cancelled": "true",
+    })
+    assert response.ok, f"Expected bookings list, got status {response.status}"
+    return response.json()["events"]
+
+
+def list_booking_ids(page):
+    """
+    Event IDs of the bookings the admin API lists, cancelled ones included.
+    
+    Args:
+        page: Playwright page object
+        
+    Returns:
+        List of event IDs
+    """
+    return [event["event_id"] for event in list_bookings(page)]
+
 
-def test_delete_bookings_flow(headless=False):
+def delete_booking(page, event_id):
     """
-    End-to-end test for deleting all bookings in the admin interface.
+    Delete a booking with the admin API.
+    
+    Args:
+        page: Playwright page object
+        event_id: Event ID of the booking
+    """
+    delete_response = page.request.delete(f"{BASE_URL}{url_admin_delete_api}/{event_id}")
+    assert delete_response.ok, f"Expected booking {event_id} to be deleted, got status {delete_response.status}"
+    log.debug("Deleted booking with ID: %s", event_id)
+
+
+def delete_booking_by_payment_id(page, payment_id, timeout=booking_cleanup_timeout):
+    """
+    Delete the bookings paid with a payment ID, e.g. the Stripe checkout session ID of a booking flow.
+    The payment webhook creates the booking, so the bookings are listed again until it shows up or the timeout passes.
+    
+    Args:
+        page: Playwright page object
+        payment_id: Payment ID stored with the booking
+        timeout: Timeout in milliseconds for the booking to show up
+        
+    Returns:
+        List of the deleted event IDs, empty if no booking showed up in time
+    """
+    deadline_ns = time.monotonic_ns() + timeout * 1_000_000
+    while True:
+        event_ids = [event["event_id"] for event in list_bookings(page) if event.get("payment_id") == payment_id]
+        if event_ids or time.monotonic_ns() >= deadline_ns:
+            break
+        page.wait_for_timeout(500)
+    
+    if not event_ids:
+        log.warning("No booking with payment ID %s showed up to delete", payment_id)
+    for event_id in event_ids:
+        delete_booking(page, event_id)
+    return event_ids
+
+
+def delete_bookings_via_api(page):
+    """
+    Delete all bookings with admin API calls instead of the admin page.
+    The API requests reuse the HTTP auth credentials of the page's browser context.
+    
+    Args:
+        page: Playwright page object
+        
+    Returns:
+        List of the deleted event IDs
+    """
+    event_ids = list_booking_ids(page)
+    log.debug("Found %s bookings to delete", len(event_ids))
+    
+    for event_id in event_ids:
+        delete_booking(page, event_id)
+    
+    return event_ids
+
+
+def test_delete_bookings_flow(headless=False, browser=None, context=None):
+    """
+    End-to-end test for deleting all bookings via the admin API.
+    The admin page is loaded once afterwards to verify that none of the deleted bookings is listed;
+    bookings created in the meantime may still be there.
+    """
+    # Setup browser with shared function
+    playwright, page, context, browser, recording_info = setup_browser(
+        headless=headless, test_name="delete_bookings_flow", browser=browser, context=context
+    )
+
+    try:
+        deleted_ids = set(delete_bookings_via_api(page))
+        
+        # Verify that the API no longer lists the deleted bookings
+        still_listed = deleted_ids & set(list_booking_ids(page))
+        assert not still_listed, f"Expected deleted bookings to be gone, still listed: {sorted(still_listed)}"
+        
+        # Verify on the admin bookings page
+        log.debug("Navigating to admin bookings page...")
+        page.goto(f"{BASE_URL}{url_admin_booking}")
+        no_bookings_message = page.locator(f"p.text-center:text('{no_bookings_text}')")
+        booking_items = page.locator(f"#{admin_booking_list_id} > *")
+        booking_items.first.or_(no_bookings_message).wait_for()
+        
+        # Read the booking IDs of the rendered delete buttons in one round-trip
+        onclicks = page.locator(f"#{admin_booking_list_id} button[onclick*='promptDelete']").evaluate_all(
+            "(buttons) => buttons.map((button) => button.getAttribute('onclick'))"
+        )
+        rendered_ids = {match.group(1) for match in map(prompt_delete_pattern.search, onclicks) if match}
+        still_rendered = deleted_ids & rendered_ids
+        assert not still_rendered, f"Expected deleted bookings to be gone, still shown: {sorted(still_rendered)}"
+        
+        log.debug("Test completed. Total bookings deleted: %s", len(deleted_ids))
+
+    finally:
+        # Clean up with shared function
+        cleanup_browser(playwright, context, browser, recording_info)
+
+
+def test_delete_bookings_ui_flow(headless=False, browser=None, context=None, max_deletions=None, booking_id=None):
+    """
+    End-to-end test for deleting bookings by clicking through the admin interface.
     Handles the case where the page reloads after each deletion and
     also detects when there are no bookings.
+    
+    Args:
+        headless: Whether to run in headless mode
+        browser: Shared browser to run the test in
+        context: Shared admin context to open the page in
+        max_deletions: Maximum number of bookings to delete, all if None
+        booking_id: Event ID of the only booking to delete instead of the first ones,
+            verified to be gone afterwards
     """
     # Setup browser with shared function
-    playwright, page, context, browser, recording_info = setup_browser(headless=headless, test_name="delete_bookings_flow")
+    playwright, page, context, browser, recording_info = setup_browser(
+        headless=headless, test_name="delete_bookings_ui_flow", browser=browser, context=context
+    )
 
     try:
         # Navigate to the admin bookings page
-        print("Navigating to admin bookings page...")
-        page.goto(f"{BASE_URL}{url_admin_booking}")
+        log.debug("Navigating to admin bookings page...")
+        page.goto(f"{BASE_URL}{url_admin_booking}", wait_until="domcontentloaded")
         
-        # Wait for page to load
-        page.wait_for_load_state("networkidle")
-        print("Page loaded")
+        # Wait for the bookings or the "no bookings" message to be rendered
+        no_bookings_message = page.locator(f"p.text-center:text('{no_bookings_text}')")
+        booking_list = page.locator(f"#{admin_booking_list_id}")
+        booking_items = booking_list.locator("> *")
+        bookings_rendered = booking_items.first.or_(no_bookings_message)
+        bookings_rendered.wait_for()
+        log.debug("Page loaded")
         
         # Check if there are any bookings or if the "no bookings" message is displayed
-        no_bookings_message = page.locator("p.text-center:text('Keine Buchungen im Zeitraum.')")
-        
         if no_bookings_message.is_visible():
-            print("No bookings found - nothing to delete")
+            assert booking_id is None, f"Expected booking {booking_id} to be listed on the admin page"
+            log.debug("No bookings found - nothing to delete")
             return
             
-        # Keep deleting until no more bookings are found or the "no bookings" message appears
+        # Set up the dialog handler for the confirmation dialogs BEFORE deleting,
+        # it records the dialogs so the confirm button is only waited for without one
+        dialogs = []
+        
+        def accept_dialog(dialog):
+            dialogs.append(dialog.type)
+            dialog.accept()
+        
+        page.on("dialog", accept_dialog)
+        confirm_delete = page.locator(f"#{button_confirm_delete_id}")
+        
+        # Keep deleting until the bookings counted up front are deleted
         deleted_count = 0
+        remaining = booking_items.count()
+        if booking_id is not None:
+            remaining = 1
+        elif max_deletions is not None:
+            remaining = min(remaining, max_deletions)
         
-        while True:
-            # Wait for the page to be fully loaded
-            page.wait_for_load_state("networkidle")
+        while remaining > 0:
+            # Wait for the booking list to be rendered
+            bookings_rendered.wait_for()
             
-            # Check if the "no bookings" message is visible now
-            if page.locator("p.text-center:text('Keine Buchungen im Zeitraum.')").is_visible():
-                print(f"All bookings deleted. Total: {deleted_count}")
-                break
-                
-            # Get a fresh reference to the booking list
-            booking_list = page.locator(f"#{admin_booking_list_id}")
-            
-            # Get the first booking item (if any)
-            booking_items = booking_list.locator("> *")
+            # Read the delete button's onclick of every booking item in one round-trip,
+            # None for items without a delete button
+            onclicks = page.evaluate("""([listId, deleteText]) =>
+                [...document.querySelectorAll(`#${listId} > *`)].map((item) => {
+                    const button = [...item.querySelectorAll("button")].find((b) => b.textContent.includes(deleteText))
+                        || item.querySelector("button[onclick*='promptDelete']");
+                    return button ? button.getAttribute("onclick") || "" : null;
+                })""", [admin_booking_list_id, button_delete_text])
             
             # Check if there are any booking items
-            if booking_items.count() == 0:
-                print(f"No more booking items found. Total deleted: {deleted_count}")
+            booking_count = len(onclicks)
+            if booking_count == 0:
+                log.debug("No more booking items found. Total deleted: %s", deleted_count)
                 break
                 
-            # Get the first booking item
-            booking_item = booking_items.first
-            
-            # Try to find the delete button
-            delete_button = booking_item.locator(f"button:has-text('{button_delete_text}')")
+            # Delete the first booking item, or the one of the given booking
+            index = 0
+            if booking_id is not None:
+                index = next(
+                    (i for i, onclick in enumerate(onclicks) if onclick and f"promptDelete('{booking_id}'" in onclick),
+                    None,
+                )
+                assert index is not None, f"Expected booking {booking_id} to be listed on the admin page"
             
-            # If the button with text isn't found, try finding it by onclick attribute
-            if delete_button.count() == 0:
-                delete_button = booking_item.locator("button[onclick*='promptDelete']")
-            
-            # If still no delete button found, log and break
-            if delete_button.count() == 0:
-                print("No delete button found in the booking item. Stopping.")
+            # If the booking item has no delete button, log and break
+            onclick = onclicks[index]
+            if onclick is None:
+                log.debug("No delete button found in the booking item. Stopping.")
                 break
-                
-            # Extract booking details for logging
-            try:
-                # Try to get ID from onclick attribute
-                onclick = delete_button.get_attribute("onclick")
-                booking_id = "unknown"
-                
-                if onclick:
-                    import re
-                    match = re.search(r"promptDelete\('([^']+)'", onclick)
-                    if match:
-                        booking_id = match.group(1)
-                        
-                print(f"Deleting booking with ID: {booking_id}")
-            except Exception as e:
-                print(f"Error extracting booking ID: {e}")
-                print("Continuing with deletion anyway...")
             
-            # Set up dialog handler for confirmation dialog
-            page.once("dialog", lambda dialog: dialog.accept())
-            
-            # Click the delete button
-            delete_button.click()
-            
-            # Wait for the confirmation dialog to be handled
-            page.wait_for_timeout(500)
+            # Get the delete button of the booking item, by text or by onclick attribute
+            booking_item = booking_items.nth(index)
+            delete_button = booking_item.locator(f"button:has-text('{button_delete_text}')").or_(
+                booking_item.locator("button[onclick*='promptDelete']")
+            ).first
+                
+            # Extract booking ID for logging
+            deleted_id = "unknown"
+            if onclick:
+                match = prompt_delete_pattern.search(onclick)
+                if match:
+                    deleted_id = match.group(1)
+            log.debug("Deleting booking with ID: %s", deleted_id)
             
-            # Look for confirm delete button if it appears
-            try:
-                confirm_delete = page.locator(f"#{button_confirm_delete_id}")
-                if confirm_delete.is_visible(timeout=2000):
-                    print("Clicking confirm delete button")
-                    confirm_delete.click()
-            except Exception as e:
-                print(f"No confirm button found or error: {e}")
-                print("Continuing with test...")
+            # Click the delete button and wait for the delete API call to return
+            dialogs.clear()
+            with page.expect_response(
+                lambda response: url_admin_api in response.url and response.request.method == "DELETE"
+            ):
+                # The click returns after a native confirm dialog was accepted
+                delete_button.click()
+                
+                # Look for confirm delete button if no native dialog asked for confirmation
+                if not dialogs:
+                    try:
+                        confirm_delete.wait_for(state="visible", timeout=2000)
+                    except PlaywrightTimeoutError:
+                        log.debug("No confirm button found, continuing with test...")
+                    else:
+                        log.debug("Clicking confirm delete button")
+                        confirm_delete.click()
+                        confirm_delete.wait_for(state="hidden")
             
-            # Wait for the page to reload/update after deletion
-            page.wait_for_load_state("networkidle")
+            # Wait for the list to update after deletion
+            if booking_count > 1:
+                booking_items.nth(booking_count - 1).wait_for(state="detached")
+            else:
+                no_bookings_message.wait_for(state="visible")
             
-            # Increment counter
+            # Update counters
             deleted_count += 1
-            print(f"Successfully deleted booking #{deleted_count}")
+            remaining -= 1
+            log.debug("Successfully deleted booking #%s", deleted_count)
             
-            # Brief pause to ensure everything is settled
-            page.wait_for_timeout(1000)
+        # Confirm once that the list is empty when all bookings were to be deleted
+        if max_deletions is None and booking_id is None:
+            assert remaining == 0, f"Expected all bookings to be deleted, {remaining} left after {deleted_count} deletions"
+            try:
+                no_bookings_message.wait_for(state="visible")
+            except PlaywrightTimeoutError as e:
+                raise AssertionError(f"Expected '{no_bookings_text}' after deleting all bookings") from e
+            log.debug("All bookings deleted. Total: %s", deleted_count)
+        
+        # Confirm that the given booking is gone from the page and the API
+        if booking_id is not None:
+            assert deleted_count == 1, f"Expected booking {booking_id} to be deleted"
+            assert booking_list.locator(f"button[onclick*=\"promptDelete('{booking_id}'\"]").count() == 0, \
+                f"Expected booking {booking_id} to be removed from the admin page"
+            assert booking_id not in list_booking_ids(page), f"Expected booking {booking_id} to be deleted"
             
-        print(f"Test completed. Total bookings deleted: {deleted_count}")
+        log.debug("Test completed. Total bookings deleted: %s", deleted_count)
 
-    except Exception as e:
-        print(f"Test failed with error: {e}")
-        # Take a screenshot on failure
-        page.screenshot(path=f"delete_bookings_error_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.png")
-        raise
-        
     finally:
         # Clean up with shared function
         cleanup_browser(playwright, context, browser, recording_info)
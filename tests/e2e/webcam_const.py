@@ -4,3 +4,5 @@ room_name_id = get_var_from_env("room_name", "room_name")
 user_name_id = get_var_from_env("user_name", "user_name")
 button_join_id = get_var_from_env("button_join", "button_join")
 button_leave_id = get_var_from_env("button_leave", "button_leave")
+# How long the webcam session stays open when the test is recorded, in milliseconds
+webcam_record_duration = int(get_var_from_env("webcam_record_duration", 10000))